@@ -26,10 +26,15 @@ class RootParseContext:
     which created it so that it can refer to config within it.
     """
 
-    def __init__(self, dialect, indentation_config=None, recurse=True):
+    def __init__(
+        self, dialect, indentation_config=None, recurse=True, shared_prune_cache=False
+    ):
         """Store persistent config objects."""
         self.dialect = dialect
         self.recurse = recurse
+        # Whether grammars may share their pruned options between parse
+        # contexts, rather than starting from scratch for each one.
+        self.shared_prune_cache = shared_prune_cache
         # Indentation config is used by Indent and Dedent and used to control
         # the intended indentation of certain features. Specifically it is
         # used in segments_common.Indent.when().
@@ -57,6 +62,7 @@ class RootParseContext:
             dialect=config.get("dialect_obj"),
             recurse=config.get("recurse"),
             indentation_config=indentation_config,
+            shared_prune_cache=bool(config.get("shared_prune_cache")),
         )
         # Set any overrides in the creation
         for key in overrides:
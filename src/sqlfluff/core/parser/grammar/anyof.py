@@ -1,20 +1,71 @@
 """AnyNumberOf and OneOf."""
 
-from typing import List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
-from sqlfluff.core.parser.helpers import trim_non_code_segments
 from sqlfluff.core.parser.match_result import MatchResult
 from sqlfluff.core.parser.match_wrapper import match_wrapper
-from sqlfluff.core.parser.match_logging import parse_match_logging
+from sqlfluff.core.parser.match_logging import (
+    parse_match_logging,
+    parse_match_logging_enabled,
+)
 from sqlfluff.core.parser.context import ParseContext
-from sqlfluff.core.parser.segments import BaseSegment
+from sqlfluff.core.parser.segments import BaseSegment, KeywordSegment, SymbolSegment
 
 from sqlfluff.core.parser.grammar.base import (
     BaseGrammar,
     MatchableType,
+    Ref,
     cached_method_for_parse_context,
 )
 
+# The available options for each possible first raw element, and the
+# options available for any other first element.
+PruneTable = Tuple[Dict[str, Tuple[MatchableType, ...]], Tuple[MatchableType, ...]]
+
+# Prune tables shared between parse contexts if `shared_prune_cache` is
+# set, keyed by grammar and dialect. It's emptied when it reaches
+# _SHARED_PRUNE_CACHE_LIMIT entries, to stop it growing unbounded.
+_SHARED_PRUNE_CACHE: Dict[Tuple, PruneTable] = {}
+_SHARED_PRUNE_CACHE_LIMIT = 16384
+
+
+def _max_match_length(
+    elem: MatchableType, parse_context: ParseContext, seen=frozenset()
+) -> Optional[int]:
+    """Return the longest match (in characters) that `elem` could return.
+
+    This is only worked out for keywords and symbols, and for any `Ref` or
+    `OneOf` made up of them. Returns None if the match is unbounded or unknown.
+    """
+    if id(elem) in seen:
+        # Recursive grammar, so give up.
+        return None
+    seen = seen | {id(elem)}
+    if isinstance(elem, BaseGrammar) and elem.ephemeral_segment:
+        # Ephemeral grammars match everything they're given.
+        return None
+    elif isinstance(elem, Ref):
+        return _max_match_length(
+            elem._get_elem(dialect=parse_context.dialect), parse_context, seen
+        )
+    elif (
+        isinstance(elem, AnyNumberOf)
+        # Subclasses (e.g. Delimited) may match more than once.
+        and type(elem) in (AnyNumberOf, OneOf)
+        and elem.max_times == 1
+    ):
+        max_length = 0
+        for opt in elem._elements:
+            opt_length = _max_match_length(opt, parse_context, seen)
+            if opt_length is None:
+                return None
+            max_length = max(max_length, opt_length)
+        return max_length
+    elif isinstance(elem, type) and issubclass(elem, (KeywordSegment, SymbolSegment)):
+        # These only ever match a single segment which matches their template.
+        return len(elem._template)
+    return None
+
 
 class AnyNumberOf(BaseGrammar):
     """A more configurable version of OneOf."""
@@ -24,21 +75,87 @@ class AnyNumberOf(BaseGrammar):
         self.min_times = kwargs.pop("min_times", 0)
         # Any patterns to _prevent_ a match.
         self.exclude = kwargs.pop("exclude", None)
+        # The prune table, and the uuid of the parse context it's for.
+        self._prune_cache = (None, ({}, ()))
+        # The last pruning, as (uuid, first raw element, available options).
+        self._last_prune = (None, None, None)
         super().__init__(*args, **kwargs)
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[FrozenSet[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         AnyNumberOf does provide this, as long as *all* the elements *also* do.
+        The options are returned as a set, which makes checking them cheap.
+        """
+        simple_buff: Set[str] = set()
+        for _, simple in self._simple_options(parse_context):
+            if simple is None:
+                return None
+            simple_buff.update(simple)
+        return frozenset(simple_buff)
+
+    @cached_method_for_parse_context
+    def _simple_options(
+        self, parse_context: ParseContext
+    ) -> Tuple[Tuple[MatchableType, Optional[FrozenSet[str]]], ...]:
+        """Pair each of the elements with its simple matcher.
+
+        These don't change within a parse context, so we cache them
+        rather than walking the grammar again on each match. They are
+        stored as sets to make checking the first element cheap.
         """
-        simple_buff = [
-            opt.simple(parse_context=parse_context) for opt in self._elements
-        ]
-        if any(elem is None for elem in simple_buff):
+        simple_options = []
+        for opt in self._elements:
+            simple = opt.simple(parse_context=parse_context)
+            if simple is not None:
+                simple = frozenset(simple)
+            simple_options.append((opt, simple))
+        return tuple(simple_options)
+
+    @cached_method_for_parse_context
+    def _exclude_simple(self, parse_context: ParseContext) -> Optional[FrozenSet[str]]:
+        """Fetch the simple matcher of the exclude grammar as a set."""
+        simple = self.exclude.simple(parse_context=parse_context)
+        if simple is None:
             return None
-        # Flatten the list
-        return [inner for outer in simple_buff for inner in outer]
+        return frozenset(simple)
+
+    @cached_method_for_parse_context
+    def _max_lengths(
+        self, parse_context: ParseContext
+    ) -> Dict[MatchableType, Optional[int]]:
+        """Fetch the longest match each of the elements could return."""
+        return {
+            opt: _max_match_length(opt, parse_context=parse_context)
+            for opt in self._elements
+        }
+
+    def _exclude_may_match(
+        self, segments: Tuple[BaseSegment, ...], parse_context: ParseContext
+    ) -> bool:
+        """Use the simple matcher of the exclude grammar to rule it out early."""
+        exclude_simple = self._exclude_simple(parse_context)
+        if exclude_simple is None:
+            # Not simple, we'll have to do a full match.
+            return True
+        # The exclude grammar may allow gaps, so skip any leading non-code.
+        first_elem = self._first_non_whitespace(seg for seg in segments if seg.is_code)
+        return first_elem in exclude_simple
+
+    def _is_excluded(
+        self, segments: Tuple[BaseSegment, ...], parse_context: ParseContext
+    ) -> bool:
+        """Check whether the exclude grammar (if any) matches the segments.
+
+        If the exclude grammar is simple, we only try the full match
+        when the first code element is one it could start with.
+        """
+        if self.exclude and self._exclude_may_match(segments, parse_context):
+            with parse_context.deeper_match() as ctx:
+                if self.exclude.match(segments, parse_context=ctx):
+                    return True
+        return False
 
     def is_optional(self) -> bool:
         """Return whether this element is optional.
@@ -50,73 +167,108 @@ class AnyNumberOf(BaseGrammar):
 
     def _prune_options(
         self, segments: Tuple[BaseSegment, ...], parse_context: ParseContext
-    ) -> Tuple[List[MatchableType], List[str]]:
-        """Use the simple matchers to prune which options to match on."""
-        str_buff = [segment.raw_upper for segment in self._iter_raw_segs(segments)]
-
-        available_options = []
-        simple_opts = []
-        prune_buff = []
-        non_simple = 0
-        pruned_simple = 0
-        matched_simple = 0
+    ) -> Tuple[MatchableType, ...]:
+        """Use the simple matchers to prune which options to match on.
 
+        The result only depends on the first non-whitespace raw element
+        of `segments`, so this is a lookup in the prune table. The last
+        lookup is kept, because the same first element is often pruned
+        several times in a row.
+        """
         # Find the first code element to match against.
-        first_elem = None
-        for elem in str_buff:
-            if elem.strip():
-                first_elem = elem
-                break
+        first_elem = self._first_non_whitespace(segments)
+        last_uuid, last_elem, available_options = self._last_prune
+        if last_uuid is not parse_context.uuid or last_elem != first_elem:
+            options_by_elem, non_simple_options = self._prune_table(parse_context)
+            if first_elem is None:
+                available_options = non_simple_options
+            else:
+                available_options = options_by_elem.get(first_elem, non_simple_options)
+            self._last_prune = (parse_context.uuid, first_elem, available_options)
 
-        for opt in self._elements:
-            simple = opt.simple(parse_context=parse_context)
+        if parse_match_logging_enabled(parse_context, v_level=3):
+            simple_options = self._simple_options(parse_context)
+            non_simple = sum(simple is None for _, simple in simple_options)
+            prune_buff = [
+                opt
+                for opt, simple in simple_options
+                if simple is not None and first_elem not in simple
+            ]
+            parse_match_logging(
+                self.__class__.__name__,
+                "match",
+                "PRN",
+                parse_context=parse_context,
+                v_level=3,
+                ns=non_simple,
+                ps=len(prune_buff),
+                ms=len(available_options) - non_simple,
+                pruned=prune_buff,
+                opts=available_options or "ALL",
+            )
+
+        return available_options
+
+    def _prune_table(self, parse_context: ParseContext) -> PruneTable:
+        """Fetch the prune table for this parse context.
+
+        This is cached against the uuid of the parse context, unless
+        `shared_prune_cache` is set, in which case it's shared between
+        parse contexts with the same dialect.
+        """
+        cache_uuid, prune_table = self._prune_cache
+        if cache_uuid is parse_context.uuid:
+            return prune_table
+
+        if parse_context.shared_prune_cache:
+            cache_key = (self, parse_context.dialect)
+            if cache_key in _SHARED_PRUNE_CACHE:
+                prune_table = _SHARED_PRUNE_CACHE[cache_key]
+            else:
+                if len(_SHARED_PRUNE_CACHE) >= _SHARED_PRUNE_CACHE_LIMIT:
+                    _SHARED_PRUNE_CACHE.clear()
+                prune_table = self._build_prune_table(parse_context)
+                _SHARED_PRUNE_CACHE[cache_key] = prune_table
+        else:
+            prune_table = self._build_prune_table(parse_context)
+
+        self._prune_cache = (parse_context.uuid, prune_table)
+        return prune_table
+
+    def _build_prune_table(self, parse_context: ParseContext) -> PruneTable:
+        """Work out the available options for each possible first element.
+
+        Returns a tuple of a dict mapping each simple option to the elements
+        which could match starting with it, and the non-simple elements which
+        is what's available for anything else. Each keeps the order of the
+        elements, because that order decides between equal matches. They are
+        returned as tuples, because the table may be shared.
+        """
+        options_by_elem: Dict[str, List[MatchableType]] = {}
+        non_simple_options: List[MatchableType] = []
+        for opt, simple in self._simple_options(parse_context):
             if simple is None:
                 # This element is not simple, we have to do a
-                # full match with it...
-                available_options.append(opt)
-                non_simple += 1
+                # full match with it, whatever comes first.
+                non_simple_options.append(opt)
+                for options in options_by_elem.values():
+                    options.append(opt)
                 continue
-            # Otherwise we have a simple option, so let's use
-            # it for pruning.
+            # Check there are no whitespace options
+            if not all(simple_opt.strip() for simple_opt in simple):
+                raise NotImplementedError(
+                    "_prune_options not supported for whitespace matching."
+                )
             for simple_opt in simple:
-                # Check it's not a whitespace option
-                if not simple_opt.strip():
-                    raise NotImplementedError(
-                        "_prune_options not supported for whitespace matching."
-                    )
-                # We want to know if the first meaningful element of the str_buff
-                # matches the option.
-                if simple_opt in str_buff:
-                    # match the FIRST non-whitespace element of the list.
-                    if first_elem != simple_opt:
-                        # No match, carry on.
-                        continue
-                    # If we get here, it's matched the FIRST element of the string buffer.
-                    available_options.append(opt)
-                    simple_opts.append(simple_opt)
-                    matched_simple += 1
-                    break
-            else:
-                # Ditch this option, the simple match has failed
-                prune_buff.append(opt)
-                pruned_simple += 1
-                continue
-
-        parse_match_logging(
-            self.__class__.__name__,
-            "match",
-            "PRN",
-            parse_context=parse_context,
-            v_level=3,
-            ns=non_simple,
-            ps=pruned_simple,
-            ms=matched_simple,
-            pruned=prune_buff,
-            opts=available_options or "ALL",
+                if simple_opt not in options_by_elem:
+                    # Anything non-simple so far comes first.
+                    options_by_elem[simple_opt] = list(non_simple_options)
+                options_by_elem[simple_opt].append(opt)
+        return (
+            {elem: tuple(options) for elem, options in options_by_elem.items()},
+            tuple(non_simple_options),
         )
 
-        return available_options, simple_opts
-
     def _match_once(
         self, segments: Tuple[BaseSegment, ...], parse_context: ParseContext
     ) -> MatchResult:
@@ -130,9 +282,7 @@ class AnyNumberOf(BaseGrammar):
         # to return earlier if we can.
         # `segments` may already be nested so we need to break out
         # the raw segments within it.
-        available_options, _ = self._prune_options(
-            segments, parse_context=parse_context
-        )
+        available_options = self._prune_options(segments, parse_context=parse_context)
 
         # If we've pruned all the options, return unmatched (with some logging).
         if not available_options:
@@ -144,6 +294,7 @@ class AnyNumberOf(BaseGrammar):
                 available_options,
                 parse_context=ctx,
                 trim_noncode=False,
+                max_lengths=self._max_lengths(parse_context),
             )
 
         return match
@@ -159,57 +310,76 @@ class AnyNumberOf(BaseGrammar):
         """
         # First if we have an *exclude* option, we should check that
         # which would prevent the rest of this grammar from matching.
-        if self.exclude:
-            with parse_context.deeper_match() as ctx:
-                if self.exclude.match(segments, parse_context=ctx):
-                    return MatchResult.from_unmatched(segments)
+        if self._is_excluded(segments, parse_context):
+            return MatchResult.from_unmatched(segments)
 
-        # Match on each of the options
-        matched_segments: MatchResult = MatchResult.from_empty()
+        # Bind the attributes used in the loop below to locals. This
+        # saves repeated attribute lookups on what is a very hot path.
+        max_times = self.max_times
+        min_times = self.min_times
+        allow_gaps = self.allow_gaps
+        match_once = self._match_once
+
+        # Match on each of the options. We accumulate matched segments
+        # in a list, because adding to a tuple copies it every time.
+        matched_segments: List[BaseSegment] = []
         unmatched_segments: Tuple[BaseSegment, ...] = segments
         n_matches = 0
         while True:
-            if self.max_times and n_matches >= self.max_times:
+            if max_times and n_matches >= max_times:
                 # We've matched as many times as we can
-                return MatchResult(
-                    matched_segments.matched_segments, unmatched_segments
-                )
+                return MatchResult(tuple(matched_segments), unmatched_segments)
 
             # Is there anything left to match?
-            if len(unmatched_segments) == 0:
+            if not unmatched_segments:
                 # No...
-                if n_matches >= self.min_times:
-                    return MatchResult(
-                        matched_segments.matched_segments, unmatched_segments
-                    )
+                if n_matches >= min_times:
+                    return MatchResult(tuple(matched_segments), unmatched_segments)
                 else:
                     # We didn't meet the hurdle
-                    return MatchResult.from_unmatched(unmatched_segments)
+                    return MatchResult.from_unmatched(segments)
 
             # If we've already matched once...
-            if n_matches > 0 and self.allow_gaps:
-                # Consume any non-code if there is any
-                pre_seg, mid_seg, post_seg = trim_non_code_segments(unmatched_segments)
-                unmatched_segments = mid_seg + post_seg
+            if n_matches > 0 and allow_gaps:
+                # Consume any non-code if there is any. We only need to
+                # find where the code starts, rather than trimming both
+                # ends and then putting the tail back together.
+                code_idx = 0
+                while (
+                    code_idx < len(unmatched_segments)
+                    and not unmatched_segments[code_idx].is_code
+                ):
+                    code_idx += 1
+                pre_seg = unmatched_segments[:code_idx]
+                unmatched_segments = unmatched_segments[code_idx:]
+                # If there's only non-code left, there's nothing for
+                # another match to find, so we can stop here.
+                if not unmatched_segments:
+                    if n_matches >= min_times:
+                        return MatchResult(tuple(matched_segments), pre_seg)
+                    else:
+                        # We didn't meet the hurdle
+                        return MatchResult.from_unmatched(segments)
             else:
                 pre_seg = ()  # empty tuple
 
-            match = self._match_once(unmatched_segments, parse_context=parse_context)
+            match = match_once(unmatched_segments, parse_context=parse_context)
             if match:
-                matched_segments += pre_seg + match.matched_segments
+                matched_segments.extend(pre_seg)
+                matched_segments.extend(match.matched_segments)
                 unmatched_segments = match.unmatched_segments
                 n_matches += 1
             else:
                 # If we get here, then we've not managed to match. And the next
                 # unmatched segments are meaningful, i.e. they're not what we're
                 # looking for.
-                if n_matches >= self.min_times:
+                if n_matches >= min_times:
                     return MatchResult(
-                        matched_segments.matched_segments, pre_seg + unmatched_segments
+                        tuple(matched_segments), pre_seg + unmatched_segments
                     )
                 else:
                     # We didn't meet the hurdle
-                    return MatchResult.from_unmatched(unmatched_segments)
+                    return MatchResult.from_unmatched(segments)
 
 
 class OneOf(AnyNumberOf):
@@ -221,3 +391,24 @@ class OneOf(AnyNumberOf):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, max_times=1, min_times=1, **kwargs)
+
+    @match_wrapper()
+    def match(
+        self, segments: Tuple[BaseSegment, ...], parse_context: ParseContext
+    ) -> MatchResult:
+        """Match against any of the elements once.
+
+        This behaves the same as AnyNumberOf with `min_times` and
+        `max_times` of one, but skips the loop which it doesn't need.
+        """
+        if self._is_excluded(segments, parse_context):
+            return MatchResult.from_unmatched(segments)
+
+        # Is there anything to match?
+        if not segments:
+            return MatchResult.from_unmatched(segments)
+
+        match = self._match_once(segments, parse_context=parse_context)
+        if match:
+            return match
+        return MatchResult.from_unmatched(segments)
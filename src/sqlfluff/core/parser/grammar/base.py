@@ -1,7 +1,17 @@
 """Base grammar, Ref, Anything and Nothing."""
 
 import copy
-from typing import List, NamedTuple, Optional, Union, Type, Tuple
+from typing import (
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+    Type,
+    Tuple,
+)
 
 from sqlfluff.core.errors import SQLParseError
 from sqlfluff.core.string_helpers import curtail_string
@@ -160,22 +170,34 @@ class BaseGrammar(Matchable):
         )
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a lowercase hash matching route?"""
         return None
 
     @staticmethod
-    def _iter_raw_segs(segments):
+    def _first_non_whitespace(segments) -> Optional[str]:
+        """Return the uppercase raw of the first non-whitespace raw segment.
+
+        This stops as soon as one is found, rather than looking at
+        everything in `segments`. Returns None if there isn't one.
+        """
         for segment in segments:
-            yield from segment.iter_raw_seg()
+            for raw_segment in segment.iter_raw_seg():
+                raw = raw_segment.raw
+                # NB: isspace() doesn't make a new string like strip() does,
+                # and we only need the uppercase raw of the one we return.
+                if raw and not raw.isspace():
+                    return raw_segment.raw_upper
+        return None
 
     @classmethod
     def _longest_trimmed_match(
         cls,
         segments: Tuple["BaseSegment", ...],
-        matchers: List["MatchableType"],
+        matchers: Sequence["MatchableType"],
         parse_context: ParseContext,
         trim_noncode=True,
+        max_lengths: Optional[Dict["MatchableType", Optional[int]]] = None,
     ) -> Tuple[MatchResult, Optional["MatchableType"]]:
         """Return longest match from a selection of matchers.
 
@@ -183,6 +205,10 @@ class BaseGrammar(Matchable):
         If two matches of the same length match at the same time, then it's the first in
         the iterable of matchers.
 
+        Optionally `max_lengths` maps matchers to the longest match (in characters)
+        they could return, or None if unbounded. Matchers which can't beat the best
+        match so far are then skipped.
+
         Returns:
             `tuple` of (match_object, matcher).
 
@@ -197,7 +223,14 @@ class BaseGrammar(Matchable):
 
         best_match_length = 0
         # iterate at this position across all the matchers
-        for matcher in matchers:
+        for idx, matcher in enumerate(matchers):
+            if best_match_length and max_lengths:
+                max_length = max_lengths.get(matcher)
+                # To be chosen, a matcher would have to match more than the best
+                # so far, or match completely (which also means matching at least
+                # as much, because any remainder might be zero length meta segments).
+                if max_length is not None and max_length < best_match_length:
+                    continue
             # MyPy seems to require a type hint here. Not quite sure why.
             res_match: MatchResult = matcher.match(
                 segments, parse_context=parse_context
@@ -215,9 +248,20 @@ class BaseGrammar(Matchable):
                     return res_match, matcher
             elif res_match:
                 # We've got an incomplete match, if it's the best so far keep it.
-                if res_match.matched_length > best_match_length:
+                # NB: matched_length sums over the segments, so only do it once.
+                res_match_length = res_match.matched_length
+                if res_match_length > best_match_length:
                     best_match = res_match, matcher
-                    best_match_length = res_match.matched_length
+                    best_match_length = res_match_length
+                    # If none of the remaining matchers could be chosen over
+                    # this one, there's no need to try them. We don't reorder
+                    # the matchers to get here sooner, because their order
+                    # decides between complete or equally long matches.
+                    if max_lengths and not any(
+                        max_length is None or max_length >= best_match_length
+                        for max_length in map(max_lengths.get, matchers[idx + 1 :])
+                    ):
+                        break
 
         # If we get here, then there wasn't a complete match. If we
         # has a best_match, return that.
@@ -641,7 +685,7 @@ class Ref(BaseGrammar):
     allow_keyword_string_refs = False
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         A ref is simple, if the thing it references is simple.
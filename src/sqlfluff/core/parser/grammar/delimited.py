@@ -52,7 +52,7 @@ class Delimited(OneOf):
 
         # Make some buffers
         seg_buff = segments
-        matched_segments = MatchResult.from_empty()
+        matched_segments: List[BaseSegment] = []
         # delimiters is a list of tuples containing delimiter segments as we find them.
         delimiters: List[BaseSegment] = []
 
@@ -69,14 +69,14 @@ class Delimited(OneOf):
             # the content, so we must be in a trailing case.
             if len(seg_buff) == 0:
                 # Append the remaining buffer in case we're in the not is_code case.
-                matched_segments += seg_buff
+                matched_segments.extend(seg_buff)
                 # Nothing left, this is potentially a trailing case?
                 if self.allow_trailing and (
                     self.min_delimiters is None
                     or len(delimiters) >= self.min_delimiters
                 ):
                     # It is! (nothing left so no unmatched segments to append)
-                    return MatchResult.from_matched(matched_segments.matched_segments)
+                    return MatchResult.from_matched(tuple(matched_segments))
                 else:
                     return MatchResult.from_unmatched(segments)
 
@@ -128,12 +128,12 @@ class Delimited(OneOf):
                     # We have a complete match!
 
                     # First add the segment up to the delimiter to the matched segments
-                    matched_segments += match.matched_segments
+                    matched_segments.extend(match.matched_segments)
                     # Then it depends what we matched.
                     # Delimiter
                     if delimiter_matcher is self.delimiter:
                         # Then add the delimiter to the matched segments
-                        matched_segments += delimiter_match.matched_segments
+                        matched_segments.extend(delimiter_match.matched_segments)
                         # Break this for loop and move on, looking for the next delimiter
                         seg_buff = delimiter_match.unmatched_segments
                         # Still got some buffer left. Carry on.
@@ -156,7 +156,7 @@ class Delimited(OneOf):
                             return MatchResult.from_unmatched(segments)
                         else:
                             return MatchResult(
-                                matched_segments.matched_segments,
+                                tuple(matched_segments),
                                 # Return the part of the seg_buff which isn't in the
                                 # pre-content.
                                 seg_buff[pre_content_len:],
@@ -197,19 +197,19 @@ class Delimited(OneOf):
                     if mat.unmatched_segments:
                         # We have something unmatched and so we should let it also have the trailing elements
                         return MatchResult(
-                            matched_segments.matched_segments + mat.matched_segments,
+                            tuple(matched_segments) + mat.matched_segments,
                             mat.unmatched_segments,
                         )
                     else:
                         # If there's nothing unmatched in the most recent match, then we can consume the trailing
                         # non code segments
                         return MatchResult.from_matched(
-                            matched_segments.matched_segments + mat.matched_segments,
+                            tuple(matched_segments) + mat.matched_segments,
                         )
                 else:
                     # No match at the end, are we allowed to trail? If we are then return,
                     # otherwise we fail because we can't match the last element.
                     if self.allow_trailing:
-                        return MatchResult(matched_segments.matched_segments, seg_buff)
+                        return MatchResult(tuple(matched_segments), seg_buff)
                     else:
                         return MatchResult.from_unmatched(segments)
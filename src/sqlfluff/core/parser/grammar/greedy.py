@@ -1,6 +1,6 @@
 """GreedyUntil and StartsWith Grammars."""
 
-from typing import Optional, List
+from typing import Collection, Optional
 
 from sqlfluff.core.parser.helpers import trim_non_code_segments
 from sqlfluff.core.parser.match_result import MatchResult
@@ -156,7 +156,7 @@ class StartsWith(GreedyUntil):
         super(StartsWith, self).__init__(*args, **kwargs)
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         `StartsWith` is simple, if the thing it starts with is also simple.
@@ -1,6 +1,6 @@
 """Sequence and Bracketed Grammars."""
 
-from typing import Optional, List, Tuple
+from typing import Collection, Optional, Tuple
 
 from sqlfluff.core.errors import SQLParseError
 
@@ -20,7 +20,7 @@ class Sequence(BaseGrammar):
     """Match a specific sequence of elements."""
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         Sequence does provide this, as long as the *first* non-optional
@@ -185,7 +185,7 @@ class Bracketed(Sequence):
         super(Bracketed, self).__init__(*args, **kwargs)
 
     @cached_method_for_parse_context
-    def simple(self, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(self, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         Bracketed does this easily, we just look for the bracket.
@@ -1,7 +1,12 @@
 """Classes to help with match logging."""
 
+import logging
+
 from sqlfluff.core.parser.helpers import join_segments_raw_curtailed
 
+# The logging levels which each v_level is logged at.
+_V_LEVEL_LOG_LEVELS = {3: logging.INFO, 4: logging.DEBUG}
+
 
 class LateLoggingObject(object):
     """A basic late binding log object for parse_match_logging.
@@ -24,10 +29,8 @@ class LateLoggingObject(object):
     def log(self):
         """Actually log this object."""
         # Otherwise carry on...
-        if self.v_level == 3:
-            self.logger.info(self)
-        elif self.v_level == 4:
-            self.logger.debug(self)
+        if self.v_level in _V_LEVEL_LOG_LEVELS:
+            self.logger.log(_V_LEVEL_LOG_LEVELS[self.v_level], self)
 
 
 class ParseMatchLogObject(LateLoggingObject):
@@ -91,3 +94,13 @@ class LateBoundJoinSegmentsCurtailed:
 
     def __str__(self):
         return repr(join_segments_raw_curtailed(self.segments))
+
+
+def parse_match_logging_enabled(parse_context, v_level=3):
+    """Return whether parse_match_logging would log anything at this v_level.
+
+    Checking this first lets callers skip building the logging arguments.
+    """
+    return v_level in _V_LEVEL_LOG_LEVELS and parse_context.logger.isEnabledFor(
+        _V_LEVEL_LOG_LEVELS[v_level]
+    )
@@ -1,6 +1,9 @@
 """Defined the `match_wrapper` which adds validation and logging to match methods."""
 
-from sqlfluff.core.parser.match_logging import ParseMatchLogObject
+from sqlfluff.core.parser.match_logging import (
+    ParseMatchLogObject,
+    parse_match_logging_enabled,
+)
 from sqlfluff.core.parser.match_result import MatchResult
 from sqlfluff.core.parser.helpers import join_segments_raw_curtailed
 
@@ -64,14 +67,15 @@ def match_wrapper(v_level=3):
                 )
 
             # Log the result.
-            WrapParseMatchLogObject(
-                grammar=func.__qualname__,
-                func="match",
-                match=m,
-                parse_context=parse_context,
-                segments=segments,
-                v_level=v_level,
-            ).log()
+            if parse_match_logging_enabled(parse_context, v_level=v_level):
+                WrapParseMatchLogObject(
+                    grammar=func.__qualname__,
+                    func="match",
+                    match=m,
+                    parse_context=parse_context,
+                    segments=segments,
+                    v_level=v_level,
+                ).log()
 
             # Basic Validation, skipped here because it still happens in the parse commands.
             return m
@@ -1,7 +1,7 @@
 """The definition of a matchable interface."""
 
 from abc import ABC
-from typing import List, Optional, TYPE_CHECKING
+from typing import Collection, Optional, TYPE_CHECKING
 
 
 if TYPE_CHECKING:
@@ -15,7 +15,7 @@ class Matchable(ABC):
     def is_optional(self) -> bool:
         """Return whether this element is optional."""
 
-    def simple(self, parse_context: "ParseContext") -> Optional[List[str]]:
+    def simple(self, parse_context: "ParseContext") -> Optional[Collection[str]]:
         """Try to obtain a simple response from the matcher."""
 
     def match(self, segments: tuple, parse_context: "ParseContext") -> "MatchResult":
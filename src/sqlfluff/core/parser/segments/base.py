@@ -12,7 +12,7 @@ from io import StringIO
 import copy
 from benchit import BenchIt
 from cached_property import cached_property
-from typing import Any, Callable, Optional, List, Tuple, NamedTuple, Iterator
+from typing import Any, Callable, Collection, Optional, Tuple, NamedTuple, Iterator
 import logging
 
 from sqlfluff.core.string_helpers import (
@@ -327,7 +327,7 @@ class BaseSegment:
     # ################ CLASS METHODS
 
     @classmethod
-    def simple(cls, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(cls, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support an uppercase hash matching route?
 
         This should be true if the MATCH grammar is simple. Most more
@@ -12,7 +12,7 @@ we use, and will be common between all of them.
 """
 
 import re
-from typing import Optional, List
+from typing import Collection, Optional
 
 from sqlfluff.core.parser.match_result import MatchResult
 from sqlfluff.core.parser.match_wrapper import match_wrapper
@@ -41,7 +41,7 @@ class _ProtoKeywordSegment(RawSegment):
     _template = "<unset>"
 
     @classmethod
-    def simple(cls, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(cls, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         The keyword segment DOES, provided that it is not case sensitive,
@@ -107,7 +107,7 @@ class ReSegment(_ProtoKeywordSegment):
     """If `_anti_template` is set, then we exclude anything that matches it."""
 
     @classmethod
-    def simple(cls, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(cls, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         Regex segment does NOT for now. We might need to later for efficiency.
@@ -158,7 +158,7 @@ class NamedSegment(_ProtoKeywordSegment):
     """
 
     @classmethod
-    def simple(cls, parse_context: ParseContext) -> Optional[List[str]]:
+    def simple(cls, parse_context: ParseContext) -> Optional[Collection[str]]:
         """Does this matcher support a uppercase hash matching route?
 
         NamedSegment segment does NOT for now. We might need to later for efficiency.
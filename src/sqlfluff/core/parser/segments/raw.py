@@ -18,7 +18,6 @@ class RawSegment(BaseSegment):
 
     def __init__(self, raw, pos_marker):
         self._raw = raw
-        self._raw_upper = raw.upper()
         # pos marker is required here
         self.pos_marker = pos_marker
 
@@ -51,7 +50,13 @@ class RawSegment(BaseSegment):
 
     @property
     def raw_upper(self):
-        """Make an uppercase string from the segments of this segment."""
+        """Make an uppercase string from the segments of this segment.
+
+        This is only worked out when it's first needed, because most
+        segments never have it looked at.
+        """
+        if self._raw_upper is None:
+            self._raw_upper = self._raw.upper()
         return self._raw_upper
 
     @property
@@ -6,10 +6,13 @@ import logging
 from sqlfluff.core.parser import KeywordSegment, ReSegment
 from sqlfluff.core.parser.context import RootParseContext
 from sqlfluff.core.parser.segments import EphemeralSegment
+from sqlfluff.core.parser.grammar import anyof
 from sqlfluff.core.parser.grammar.base import BaseGrammar
 from sqlfluff.core.parser.grammar.noncode import NonCodeMatcher
 from sqlfluff.core.parser.grammar import (
+    AnyNumberOf,
     OneOf,
+    Ref,
     Sequence,
     GreedyUntil,
     Delimited,
@@ -95,6 +98,29 @@ def test__parser__grammar__base__longest_trimmed_match__adv(seg_list, caplog):
     assert len(match) == 3
 
 
+def test__parser__grammar__base__longest_trimmed_match__max_lengths(seg_list):
+    """Test the _longest_trimmed_match method skips matchers using max_lengths."""
+    fs = KeywordSegment.make("foo")
+    baar = KeywordSegment.make("baar")
+    seq = Sequence(fs, baar)
+    with RootParseContext(dialect=None) as ctx:
+        # Without a hint, the sequence is the longest match.
+        _, matcher = BaseGrammar._longest_trimmed_match(seg_list[2:], [fs, seq], ctx)
+        assert matcher is seq
+        # If we claim it can't beat the keyword, it doesn't get tried.
+        _, matcher = BaseGrammar._longest_trimmed_match(
+            seg_list[2:], [fs, seq], ctx, max_lengths={seq: 1}
+        )
+        assert matcher is fs
+        # Once nothing remaining can beat the best match, we stop looking.
+        # NB: This Ref would raise an error if it were tried without a dialect.
+        ref = Ref("NotThere")
+        _, matcher = BaseGrammar._longest_trimmed_match(
+            seg_list[2:], [seq, ref], ctx, max_lengths={seq: None, ref: 3}
+        )
+        assert matcher is seq
+
+
 @pytest.mark.parametrize(
     "seg_list_slice,matcher_keywords,result_slice,winning_matcher,pre_match_slice",
     [
@@ -150,6 +176,13 @@ def test__parser__grammar__base__look_ahead_match(
     assert result_match.matched_segments == expected_result
 
 
+def test__parser__grammar__base__first_non_whitespace(seg_list):
+    """Test the BaseGrammar._first_non_whitespace method."""
+    assert BaseGrammar._first_non_whitespace(seg_list) == "BAR"
+    assert BaseGrammar._first_non_whitespace(seg_list[1:]) == "FOO"
+    assert BaseGrammar._first_non_whitespace(seg_list[4:]) is None
+
+
 def test__parser__grammar__base__ephemeral_segment(seg_list):
     """Test the ephemeral features BaseGrammar.
 
@@ -228,6 +261,96 @@ def test__parser__grammar_oneof_exclude(seg_list):
         assert not g.match(seg_list, parse_context=ctx)
 
 
+def test__parser__grammar_oneof_exclude_simple(seg_list):
+    """Test the OneOf grammar exclude option with a simple exclude grammar."""
+    fs = KeywordSegment.make("foo")
+    bs = KeywordSegment.make("bar")
+    baar = KeywordSegment.make("baar")
+    g = OneOf(fs, bs, exclude=Sequence(fs, baar))
+    with RootParseContext(dialect=None) as ctx:
+        # The exclude grammar can't start here, so it's ruled out early.
+        assert not g._exclude_may_match(seg_list, parse_context=ctx)
+        assert g.match(seg_list, parse_context=ctx)
+        # Leading non-code is skipped when checking the exclude grammar.
+        assert g._exclude_may_match(seg_list[1:], parse_context=ctx)
+        assert not g.match(seg_list[2:], parse_context=ctx)
+        assert g.match(seg_list[2:3], parse_context=ctx)
+
+
+def test__parser__grammar_oneof_simple():
+    """Test the OneOf grammar returns its simple options as a set."""
+    fs = KeywordSegment.make("foo")
+    bs = KeywordSegment.make("bar")
+    with RootParseContext(dialect=None) as ctx:
+        assert OneOf(fs, bs, fs).simple(ctx) == frozenset(["FOO", "BAR"])
+        assert OneOf(fs, ReSegment.make(r"fo{2}")).simple(ctx) is None
+        # Whitespace options are only a problem when pruning.
+        g = OneOf(fs, KeywordSegment.make(" "))
+        assert g.simple(ctx) == frozenset(["FOO", " "])
+        with pytest.raises(NotImplementedError):
+            g._prune_options((), parse_context=ctx)
+
+
+def test__parser__grammar_oneof_prune_cache(seg_list):
+    """Test that OneOf caches its pruned options per parse context."""
+    fs = KeywordSegment.make("foo")
+    bs = KeywordSegment.make("bar")
+    fooRegex = ReSegment.make(r"fo{2}")
+    g = OneOf(fs, fooRegex, bs)
+    with RootParseContext(dialect=None) as ctx:
+        # Leading whitespace is skipped when pruning, and the order
+        # of the elements is kept.
+        opts = g._prune_options(seg_list[1:], parse_context=ctx)
+        assert opts == (fs, fooRegex)
+        assert g._prune_options(seg_list, parse_context=ctx) == (fooRegex, bs)
+        # Calls with the same first element reuse the same result.
+        assert g._prune_options(seg_list[2:3], parse_context=ctx) is opts
+        assert g._prune_options(seg_list[2:], parse_context=ctx) is opts
+    # A new parse context invalidates the cache.
+    with RootParseContext(dialect=None) as ctx:
+        assert g._prune_options(seg_list[2:], parse_context=ctx) is not opts
+
+
+def test__parser__grammar_oneof_max_match_length(seg_list):
+    """Test working out the longest match that an element of OneOf could return."""
+    fs = KeywordSegment.make("foo")
+    baar = KeywordSegment.make("baar")
+    g = OneOf(fs, OneOf(fs, baar), Sequence(fs, baar), AnyNumberOf(fs))
+    with RootParseContext(dialect=None) as ctx:
+        assert list(g._max_lengths(ctx).values()) == [3, 4, None, None]
+
+
+def test__parser__grammar_oneof_ephemeral_option(
+    generate_test_segments, fresh_ansi_dialect
+):
+    """Test an ephemeral option of OneOf isn't skipped for being too short."""
+    seg_list = generate_test_segments(["select", " ", "a", " ", "b", " ", "c"])
+    g = OneOf(
+        Sequence("SELECT", Ref("NakedIdentifierSegment")),
+        Ref("SelectKeywordSegment", ephemeral_name="Stuff"),
+    )
+    with RootParseContext(dialect=fresh_ansi_dialect) as ctx:
+        assert g._max_lengths(ctx)[g._elements[1]] is None
+        m = g.match(seg_list, parse_context=ctx)
+        assert m.is_complete()
+        assert isinstance(m.matched_segments[0], EphemeralSegment)
+
+
+def test__parser__grammar_oneof_shared_prune_cache(seg_list, monkeypatch):
+    """Test that OneOf can share its pruned options between parse contexts."""
+    # Use a fresh shared cache, so nothing leaks between tests.
+    monkeypatch.setattr(anyof, "_SHARED_PRUNE_CACHE", {})
+    fs = KeywordSegment.make("foo")
+    bs = KeywordSegment.make("bar")
+    g = OneOf(fs, bs)
+    with RootParseContext(dialect=None, shared_prune_cache=True) as ctx:
+        opts = g._prune_options(seg_list, parse_context=ctx)
+        assert opts == (bs,)
+    with RootParseContext(dialect=None, shared_prune_cache=True) as ctx:
+        assert g._prune_options(seg_list, parse_context=ctx) is opts
+    assert list(anyof._SHARED_PRUNE_CACHE) == [(g, None)]
+
+
 def test__parser__grammar_oneof_take_longest_match(seg_list):
     """Test that the OneOf grammar takes the longest match."""
     fooRegex = ReSegment.make(r"fo{2}")
@@ -275,6 +398,33 @@ def test__parser__grammar_oneof_take_first(seg_list):
         )
 
 
+def test__parser__grammar_anynumberof_min_times(seg_list):
+    """Test AnyNumberOf returns everything unmatched if min_times isn't met."""
+    fs = KeywordSegment.make("foo")
+    g = AnyNumberOf(fs, min_times=2)
+    with RootParseContext(dialect=None) as ctx:
+        # One real match, followed by code which doesn't match.
+        m = g.match(seg_list[2:], parse_context=ctx)
+        assert not m
+        assert m.unmatched_segments == seg_list[2:]
+
+
+def test__parser__grammar_anynumberof_trailing_non_code(seg_list):
+    """Test AnyNumberOf with only non-code left after a match."""
+    fs = KeywordSegment.make("foo")
+    baar = KeywordSegment.make("baar")
+    with RootParseContext(dialect=None) as ctx:
+        g = AnyNumberOf(fs, baar)
+        m = g.match(seg_list[2:], parse_context=ctx)
+        assert len(m) == 2
+        assert m.unmatched_segments == seg_list[4:]
+        # If we don't meet the hurdle, we get everything back unmatched.
+        g = AnyNumberOf(fs, baar, min_times=3)
+        m = g.match(seg_list[2:], parse_context=ctx)
+        assert not m
+        assert m.unmatched_segments == seg_list[2:]
+
+
 @pytest.mark.parametrize(
     "keyword,match_truthy",
     [
@@ -41,6 +41,14 @@ def test__parser__base_segments_raw_init():
     RawSegment("foobar", FilePositionMarker())
 
 
+def test__parser__base_segments_raw_upper():
+    """Test the uppercase raw of a raw segment is only made when needed."""
+    seg = RawSegment("foobar", FilePositionMarker())
+    assert seg._raw_upper is None
+    assert seg.raw_upper == "FOOBAR"
+    assert seg._raw_upper == "FOOBAR"
+
+
 def test__parser__base_segments_type():
     """Test the .is_type() method."""
     assert BaseSegment.is_type("base")